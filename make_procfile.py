@@ -1,4 +1,4 @@
 # make_procfile.py
 with open('Procfile', 'w') as f:
-    f.write('web: cd src/web_app && python app.py')
+    f.write('web: cd src/web_app && gunicorn wsgi:app --preload --worker-class gthread --threads 4 --bind 0.0.0.0:$PORT')
 print("Procfile created successfully!")
\ No newline at end of file
@@ -5,12 +5,40 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
+import logging
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from data_collection.database_setup import AgricultureDatabase
 from data_collection.nasa_api import NASAEarthData
 
+logger = logging.getLogger(__name__)
+
+# Weights for yield, health, area and the random resilience factor
+PRIORITY_WEIGHTS = np.array([0.35, 0.30, 0.25, 0.10])
+
+# NDVI status bands: <= 0.4 stressed, <= 0.6 monitor, above that healthy
+NDVI_STATUS_BINS = np.array([0.4, 0.6])
+NDVI_STATUS_LABELS = np.array(['STRESSED', 'MONITOR', 'HEALTHY'])
+
+def _min_max_scale(values, out=None):
+    if out is None:
+        out = np.empty(len(values))
+    out[:] = values
+    out -= out.min()
+    out /= out.max()
+    return out
+
+def _top_fields(analysis_data, k):
+    """Return the k highest-priority rows in descending order without a full sort"""
+    priority = analysis_data['comprehensive_priority'].to_numpy()
+    k = min(k, len(priority))
+    if k == 0:
+        return analysis_data.iloc[:0]
+    top = np.argpartition(-priority, k - 1)[:k]
+    top = top[np.argsort(-priority[top], kind='stable')]
+    return analysis_data.iloc[top]
+
 class IntegratedAgricultureAnalyzer:
     def __init__(self):
         self.db = AgricultureDatabase()
@@ -22,41 +50,37 @@ class IntegratedAgricultureAnalyzer:
         print(f"\nCOMPREHENSIVE FARM ANALYSIS")
         print(f"Farm ID: {farm_id}")
         
-        zones = self.db.get_water_priority_data(farm_id)
-        fields = self.db.get_field_health_data(farm_id)
+        zones_df = self.db.get_water_priority_frame(farm_id)
+        fields_df = self.db.get_field_health_frame(farm_id)
         
-        if not zones or not fields:
+        if zones_df.empty or fields_df.empty:
             print("No data found for farm ID:", farm_id)
             return None
         
-        zones_df = pd.DataFrame([dict(zone) for zone in zones])
-        fields_df = pd.DataFrame([dict(field) for field in fields])
-        
         print(f"Analyzing {len(zones_df)} management zones and {len(fields_df)} fields")
         
         # Get NDVI data for fields
-        field_data_for_ndvi = []
-        for _, field in fields_df.iterrows():
-            field_data_for_ndvi.append({
-                'field_name': field['field_name'],
-                'soil_health_score': 0.7,
-                'historical_yield': field['historical_yield']
-            })
-        
+        ndvi_input = fields_df[['field_name', 'historical_yield']].copy()
+        ndvi_input['soil_health_score'] = 0.7
+        field_data_for_ndvi = ndvi_input.to_dict('records')
+
         ndvi_results = self.nasa.calculate_ndvi_simulation(field_data_for_ndvi)
         ndvi_df = pd.DataFrame(ndvi_results)
         
         # Debug: Check what data we have
-        print("Fields data columns:", fields_df.columns.tolist())
-        print("NDVI data columns:", ndvi_df.columns.tolist())
+        logger.debug("Fields data columns: %s", fields_df.columns.tolist())
+        logger.debug("NDVI data columns: %s", ndvi_df.columns.tolist())
         
         # Merge the data carefully
         if 'ndvi_value' in ndvi_df.columns:
-            # Create a mapping from field_name to ndvi_value
-            ndvi_mapping = dict(zip(ndvi_df['field_name'], ndvi_df['ndvi_value']))
+            # Share one categorical dtype so the join runs on integer codes
+            field_names = pd.CategoricalDtype(pd.unique(pd.concat([fields_df['field_name'], ndvi_df['field_name']])))
+            fields_df['field_name'] = fields_df['field_name'].astype(field_names)
+            ndvi_df['field_name'] = ndvi_df['field_name'].astype(field_names)
             
-            # Add NDVI values to fields data
-            fields_df['ndvi_value'] = fields_df['field_name'].map(ndvi_mapping)
+            # Add NDVI values to fields data (latest simulated value per field wins)
+            ndvi_values = ndvi_df[['field_name', 'ndvi_value']].drop_duplicates('field_name', keep='last')
+            fields_df = pd.merge(fields_df.drop(columns='ndvi_value', errors='ignore'), ndvi_values, on='field_name', how='left')
             
             # Fill any missing NDVI values with a default
             fields_df['ndvi_value'] = fields_df['ndvi_value'].fillna(0.5)
@@ -66,86 +90,105 @@ class IntegratedAgricultureAnalyzer:
             print("Warning: No NDVI data found, using default values")
             fields_df['ndvi_value'] = 0.5
         
-        analysis_results = self.calculate_comprehensive_priority(fields_df, zones_df)
+        analysis_results = self.calculate_comprehensive_priority(fields_df, zones_df, sort_results=False)
         
         self.generate_irrigation_recommendations(analysis_results)
         
         return analysis_results
     
-    def calculate_comprehensive_priority(self, fields_data, zones_data):
+    def calculate_comprehensive_priority(self, fields_data, zones_data, sort_results=True):
         print("\nCalculating comprehensive water allocation priorities...")
         
         fields_data = fields_data.copy()
         
+        # Score columns are written straight into one (N, 4) buffer so the
+        # weighted sum below needs no intermediate arrays
+        scores = np.empty((len(fields_data), 4))
+        
         # Calculate scores with safety checks
-        fields_data['yield_score'] = (fields_data['historical_yield'] - fields_data['historical_yield'].min()) / (fields_data['historical_yield'].max() - fields_data['historical_yield'].min())
+        _min_max_scale(fields_data['historical_yield'].to_numpy(), out=scores[:, 0])
         
         if 'ndvi_value' in fields_data.columns:
-            fields_data['health_score'] = (fields_data['ndvi_value'] - fields_data['ndvi_value'].min()) / (fields_data['ndvi_value'].max() - fields_data['ndvi_value'].min())
+            _min_max_scale(fields_data['ndvi_value'].to_numpy(), out=scores[:, 1])
         else:
-            fields_data['health_score'] = 0.5
+            scores[:, 1] = 0.5
         
-        fields_data['area_score'] = (fields_data['area_hectares'] - fields_data['area_hectares'].min()) / (fields_data['area_hectares'].max() - fields_data['area_hectares'].min())
+        area = fields_data['area_hectares'].to_numpy(dtype=np.float64)
+        _min_max_scale(area, out=scores[:, 2])
+        scores[:, 3] = np.random.uniform(0.7, 0.9, len(fields_data))
+        
+        fields_data['yield_score'] = scores[:, 0]
+        fields_data['health_score'] = scores[:, 1]
+        fields_data['area_score'] = scores[:, 2]
         
         # Comprehensive priority score
-        fields_data['comprehensive_priority'] = (
-            0.35 * fields_data['yield_score'] +
-            0.30 * fields_data['health_score'] +
-            0.25 * fields_data['area_score'] +
-            0.10 * np.random.uniform(0.7, 0.9, len(fields_data))
-        )
+        priority = scores @ PRIORITY_WEIGHTS
+        fields_data['comprehensive_priority'] = priority
         
         available_water = 5000
-        total_priority = fields_data['comprehensive_priority'].sum()
-        fields_data['allocated_water'] = (fields_data['comprehensive_priority'] / total_priority * available_water).astype(int)
-        fields_data['allocation_sufficiency'] = fields_data['allocated_water'] / (fields_data['area_hectares'] * 15)
+        scale = available_water / priority.sum()
+        allocated = np.multiply(priority, scale).astype(np.int32, copy=False)
+        required = area * 15
+        fields_data['allocated_water'] = allocated
+        fields_data['required_water'] = required
+        fields_data['allocation_sufficiency'] = allocated / required
         
-        fields_data = fields_data.sort_values('comprehensive_priority', ascending=False)
+        if sort_results:
+            fields_data = fields_data.sort_values('comprehensive_priority', ascending=False)
         
         print("Comprehensive priority calculation completed")
         return fields_data
     
     def generate_irrigation_recommendations(self, analysis_data):
-        print("\n" + "="*60)
-        print("CLIMATE-RESILIENT IRRIGATION STRATEGY")
-        print("="*60)
-        
-        total_allocated = analysis_data['allocated_water'].sum()
-        total_required = (analysis_data['area_hectares'] * 15).sum()
-        
-        print(f"WATER ALLOCATION SUMMARY:")
-        print(f"   Total Available: {total_allocated:,} m3")
-        print(f"   Total Required:  {total_required:,.0f} m3")
-        print(f"   Allocation Rate: {(total_allocated/total_required*100):.1f}%")
-        
-        print(f"\nTOP PRIORITY FIELDS - IRRIGATE FIRST:")
-        print("-" * 50)
-        
-        high_priority = analysis_data.head(3)
-        for i, (_, field) in enumerate(high_priority.iterrows(), 1):
-            if 'ndvi_value' in analysis_data.columns:
-                status = "HEALTHY" if field['ndvi_value'] > 0.6 else "MONITOR" if field['ndvi_value'] > 0.4 else "STRESSED"
-                ndvi_display = f"NDVI: {field['ndvi_value']:.3f} ({status})"
+        # Collect the whole strategy and write it to stdout in one call
+        lines = [
+            "\n" + "="*60,
+            "CLIMATE-RESILIENT IRRIGATION STRATEGY",
+            "="*60
+        ]
+        
+        total_allocated = analysis_data['allocated_water'].to_numpy().sum()
+        total_required = analysis_data['required_water'].to_numpy().sum()
+        
+        lines.append(f"WATER ALLOCATION SUMMARY:")
+        lines.append(f"   Total Available: {total_allocated:,} m3")
+        lines.append(f"   Total Required:  {total_required:,.0f} m3")
+        lines.append(f"   Allocation Rate: {(total_allocated/total_required*100):.1f}%")
+        
+        lines.append(f"\nTOP PRIORITY FIELDS - IRRIGATE FIRST:")
+        lines.append("-" * 50)
+        
+        has_ndvi = 'ndvi_value' in analysis_data.columns
+        if has_ndvi:
+            ndvi = analysis_data['ndvi_value'].to_numpy()
+            analysis_data['ndvi_status'] = NDVI_STATUS_LABELS[np.digitize(ndvi, NDVI_STATUS_BINS, right=True)]
+        
+        high_priority = _top_fields(analysis_data, 3)
+        for i, field in enumerate(high_priority.itertuples(index=False), 1):
+            if has_ndvi:
+                ndvi_display = f"NDVI: {field.ndvi_value:.3f} ({field.ndvi_status})"
             else:
                 ndvi_display = "NDVI: Data not available"
-                
-            print(f"{i}. {field['field_name']:20} Priority: {field['comprehensive_priority']:.3f}")
-            print(f"   Water: {field['allocated_water']:4} m3 | Sufficiency: {field['allocation_sufficiency']:.1%}")
-            print(f"   {ndvi_display} | Yield: {field['historical_yield']:.1f} t/ha")
-            print()
-        
-        print("CLIMATE RESILIENCE RECOMMENDATIONS:")
-        print("1. Implement staggered irrigation based on priority ranking")
-        print("2. Monitor NDVI weekly for early stress detection")
-        print("3. Focus soil moisture conservation on lower-priority fields")
-        print("4. Consider drought-resistant cover crops for next season")
-        
-        stressed_fields = len(analysis_data[analysis_data['allocation_sufficiency'] < 0.5])
+            
+            lines.append(f"{i}. {field.field_name:20} Priority: {field.comprehensive_priority:.3f}")
+            lines.append(f"   Water: {field.allocated_water:4} m3 | Sufficiency: {field.allocation_sufficiency:.1%}")
+            lines.append(f"   {ndvi_display} | Yield: {field.historical_yield:.1f} t/ha")
+            lines.append("")
+        
+        lines.append("CLIMATE RESILIENCE RECOMMENDATIONS:")
+        lines.append("1. Implement staggered irrigation based on priority ranking")
+        lines.append("2. Monitor NDVI weekly for early stress detection")
+        lines.append("3. Focus soil moisture conservation on lower-priority fields")
+        lines.append("4. Consider drought-resistant cover crops for next season")
+        
+        stressed_fields = int((analysis_data['allocation_sufficiency'].to_numpy() < 0.5).sum())
         total_fields = len(analysis_data)
         stress_percentage = (stressed_fields / total_fields) * 100
         
-        print(f"\nRISK ASSESSMENT:")
-        print(f"   {stressed_fields}/{total_fields} fields ({stress_percentage:.1f}%) at high water stress risk")
+        lines.append(f"\nRISK ASSESSMENT:")
+        lines.append(f"   {stressed_fields}/{total_fields} fields ({stress_percentage:.1f}%) at high water stress risk")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return analysis_data
     
@@ -156,9 +199,16 @@ class IntegratedAgricultureAnalyzer:
             'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'farm_id': farm_id,
             'total_fields_analyzed': len(analysis_data),
-            'total_water_allocated': int(analysis_data['allocated_water'].sum()),
-            'priority_fields': analysis_data[['field_name', 'comprehensive_priority', 'allocated_water']].head().to_dict('records'),
-            'water_stress_risk': len(analysis_data[analysis_data['allocation_sufficiency'] < 0.5]) / len(analysis_data)
+            'total_water_allocated': int(analysis_data['allocated_water'].to_numpy().sum()),
+            'priority_fields': [
+                {
+                    'field_name': field.field_name,
+                    'comprehensive_priority': float(field.comprehensive_priority),
+                    'allocated_water': int(field.allocated_water)
+                }
+                for field in _top_fields(analysis_data, 5).itertuples(index=False)
+            ],
+            'water_stress_risk': float((analysis_data['allocation_sufficiency'].to_numpy() < 0.5).mean())
         }
         
         # Add NDVI data if available
@@ -182,6 +232,8 @@ def main():
     analyzer = IntegratedAgricultureAnalyzer()
     
     results = analyzer.get_complete_farm_analysis(farm_id=1)
+    # The analysis only simulates NDVI, so the HTTP session is not needed past this point
+    analyzer.nasa.close()
     
     if results is not None:
         report = analyzer.create_comprehensive_report(results)
@@ -1,13 +1,53 @@
 # agriculture_analysis.py
-import pandas as pd
+import sys
 import numpy as np
 from datetime import datetime
 import json
 
+# Sample field data, kept as typed arrays so DataFrame construction skips dtype inference
+_FIELD_IDS = np.array([1, 2, 3, 4, 5, 6, 7, 8], dtype=np.int64)
+_FIELD_NAMES = np.array(['North_Hills', 'South_Valley', 'East_Plateau', 'West_Plains',
+                         'Central_Basin', 'Northwest_Slope', 'Southeast_Meadow', 'Northeast_Ridge'], dtype=object)
+_AREA_HECTARES = np.array([45, 68, 52, 78, 35, 62, 55, 48], dtype=np.int64)
+_SOIL_MOISTURE = np.array([0.12, 0.28, 0.09, 0.32, 0.15, 0.22, 0.18, 0.11], dtype=np.float64)
+_NDVI_HEALTH = np.array([0.68, 0.42, 0.72, 0.51, 0.61, 0.55, 0.58, 0.70], dtype=np.float64)
+_HISTORICAL_YIELD = np.array([3.4, 2.7, 3.6, 2.8, 3.2, 3.0, 3.3, 3.5], dtype=np.float64)
+_WATER_REQUIREMENT = np.array([1200, 980, 1350, 890, 1100, 1050, 1150, 1300], dtype=np.int64)
+_DROUGHT_RISK = np.array([0.85, 0.60, 0.90, 0.55, 0.75, 0.65, 0.70, 0.88], dtype=np.float64)
+
 print("PRECISION AGRICULTURE CLIMATE RESILIENCE ANALYZER")
 print("Data Analyst Portfolio Project")
 print("Water Optimization for Drought Conditions")
 
+# Weights for yield potential, crop health, moisture deficit and drought risk
+RESILIENCE_WEIGHTS = np.array([0.35, 0.30, 0.25, 0.10])
+
+def _priority(yld, ndvi, moist, drisk, water, available_water):
+    """Core priority math on raw arrays, kept free of pandas indexing overhead"""
+    # Each factor is normalized in place into a column of one (N, 4) buffer,
+    # then combined with a single weighted matrix-vector product
+    scores = np.empty((len(yld), 4))
+    
+    yield_potential = scores[:, 0]
+    np.subtract(yld, yld.min(), out=yield_potential)
+    yield_potential /= yld.max() - yld.min()
+    
+    crop_health = scores[:, 1]
+    np.subtract(ndvi, ndvi.min(), out=crop_health)
+    crop_health /= ndvi.max() - ndvi.min()
+    
+    moisture_deficit = scores[:, 2]
+    np.divide(moist, -moist.max(), out=moisture_deficit)
+    moisture_deficit += 1
+    
+    scores[:, 3] = drisk
+    priority = scores @ RESILIENCE_WEIGHTS
+    
+    allocated = (priority / priority.sum() * available_water).astype(int)
+    sufficiency = allocated / water
+    order = np.argsort(-priority, kind='stable')
+    return yield_potential, crop_health, moisture_deficit, priority, allocated, sufficiency, order
+
 class AgricultureAnalyzer:
     def __init__(self):
         self.farm_name = "Sample Farm - Drought Prone Region"
@@ -16,19 +56,20 @@ class AgricultureAnalyzer:
     def generate_farm_data(self):
         print("Generating farm field data...")
         
-        data = {
-            'field_id': [1, 2, 3, 4, 5, 6, 7, 8],
-            'field_name': ['North_Hills', 'South_Valley', 'East_Plateau', 'West_Plains', 
-                          'Central_Basin', 'Northwest_Slope', 'Southeast_Meadow', 'Northeast_Ridge'],
-            'area_hectares': [45, 68, 52, 78, 35, 62, 55, 48],
-            'soil_moisture': [0.12, 0.28, 0.09, 0.32, 0.15, 0.22, 0.18, 0.11],
-            'ndvi_health': [0.68, 0.42, 0.72, 0.51, 0.61, 0.55, 0.58, 0.70],
-            'historical_yield': [3.4, 2.7, 3.6, 2.8, 3.2, 3.0, 3.3, 3.5],
-            'water_requirement': [1200, 980, 1350, 890, 1100, 1050, 1150, 1300],
-            'drought_risk': [0.85, 0.60, 0.90, 0.55, 0.75, 0.65, 0.70, 0.88]
-        }
-        
-        df = pd.DataFrame(data)
+        # pandas is only needed once the table is built, so code that imports this
+        # module just for _priority never loads it; the CLI demo still does
+        import pandas as pd
+        
+        df = pd.DataFrame({
+            'field_id': _FIELD_IDS,
+            'field_name': _FIELD_NAMES,
+            'area_hectares': _AREA_HECTARES,
+            'soil_moisture': _SOIL_MOISTURE,
+            'ndvi_health': _NDVI_HEALTH,
+            'historical_yield': _HISTORICAL_YIELD,
+            'water_requirement': _WATER_REQUIREMENT,
+            'drought_risk': _DROUGHT_RISK
+        })
         print("Generated data for", len(df), "fields")
         return df
     
@@ -36,22 +77,23 @@ class AgricultureAnalyzer:
         print("Calculating irrigation priorities...")
         print("Available water:", available_water, "m3")
         
-        df['yield_potential'] = (df['historical_yield'] - df['historical_yield'].min()) / (df['historical_yield'].max() - df['historical_yield'].min())
-        df['crop_health'] = (df['ndvi_health'] - df['ndvi_health'].min()) / (df['ndvi_health'].max() - df['ndvi_health'].min())
-        df['moisture_deficit'] = 1 - (df['soil_moisture'] / df['soil_moisture'].max())
-        
-        df['resilience_priority'] = (
-            0.35 * df['yield_potential'] +
-            0.30 * df['crop_health'] +
-            0.25 * df['moisture_deficit'] +
-            0.10 * df['drought_risk']
+        yield_potential, crop_health, moisture_deficit, priority, allocated, sufficiency, order = _priority(
+            df['historical_yield'].to_numpy(dtype=np.float64),
+            df['ndvi_health'].to_numpy(dtype=np.float64),
+            df['soil_moisture'].to_numpy(dtype=np.float64),
+            df['drought_risk'].to_numpy(dtype=np.float64),
+            df['water_requirement'].to_numpy(dtype=np.float64),
+            available_water
         )
         
-        total_priority = df['resilience_priority'].sum()
-        df['allocated_water'] = (df['resilience_priority'] / total_priority * available_water).astype(int)
-        df['allocation_sufficiency'] = df['allocated_water'] / df['water_requirement']
+        df['yield_potential'] = yield_potential
+        df['crop_health'] = crop_health
+        df['moisture_deficit'] = moisture_deficit
+        df['resilience_priority'] = priority
+        df['allocated_water'] = allocated
+        df['allocation_sufficiency'] = sufficiency
         
-        return df.sort_values('resilience_priority', ascending=False)
+        return df.iloc[order]
     
     def show_recommendations(self, df):
         print("IRRIGATION RECOMMENDATIONS")
@@ -87,8 +129,11 @@ def main():
         print("Field Name           Priority   Water Alloc  Sufficiency  Yield")
         print("-" * 50)
         
-        for _, row in prioritized_data.iterrows():
-            print(f"{row['field_name']:20} {row['resilience_priority']:8.3f} {row['allocated_water']:8} m3 {row['allocation_sufficiency']:8.1%} {row['historical_yield']:7.1f} t/ha")
+        rows = [
+            f"{row.field_name:20} {row.resilience_priority:8.3f} {row.allocated_water:8} m3 {row.allocation_sufficiency:8.1%} {row.historical_yield:7.1f} t/ha"
+            for row in prioritized_data.itertuples(index=False)
+        ]
+        sys.stdout.write("\n".join(rows) + "\n")
         
         analyzer.show_recommendations(prioritized_data)
         
@@ -3,8 +3,33 @@ import sqlite3
 import json
 import os
 from datetime import datetime
+import pandas as pd
+
+WATER_PRIORITY_SQL = """
+    SELECT zone_name, soil_health_score, historical_yield, water_priority, ndvi_trend
+    FROM management_zones 
+    WHERE farm_id = ? 
+    ORDER BY water_priority ASC;
+"""
+
+# Only each field's latest reading; the subquery is answered from idx_sat_field_date
+FIELD_HEALTH_SQL = """
+    SELECT f.field_name, f.area_hectares, f.historical_yield, 
+           s.ndvi_value, s.capture_date
+    FROM fields f
+    LEFT JOIN satellite_data s ON s.id = (
+        SELECT id FROM satellite_data
+        WHERE field_id = f.id
+        ORDER BY capture_date DESC
+        LIMIT 1
+    )
+    WHERE f.farm_id = ?
+    ORDER BY s.capture_date DESC;
+"""
 
 class AgricultureDatabase:
+    _shared_conn = None
+    
     def __init__(self):
         self.db_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'agriculture.db')
         self.connection = None
@@ -16,8 +41,19 @@ class AgricultureDatabase:
             # Create data directory if it doesn't exist
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row
+            # Reuse one handle (and its prepared statement cache) across instances
+            if AgricultureDatabase._shared_conn is None:
+                connection = sqlite3.connect(self.db_path, cached_statements=100, check_same_thread=False)
+                connection.row_factory = sqlite3.Row
+                
+                # WAL journaling avoids an fsync per commit during bulk inserts
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute("PRAGMA temp_store=MEMORY")
+                connection.execute("PRAGMA cache_size=-64000")
+                AgricultureDatabase._shared_conn = connection
+            
+            self.connection = AgricultureDatabase._shared_conn
             print("Connected to SQLite database")
             print(f"Database location: {self.db_path}")
         except Exception as e:
@@ -89,8 +125,28 @@ class AgricultureDatabase:
                     evapotranspiration REAL
                 );
             """)
-            
+
+            # Indexes backing the per-farm analysis queries
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_sat_field_date
+                ON satellite_data(field_id, capture_date DESC);
+            """)
+            # Covers the web dashboard's farm/fields join, so it never touches the
+            # fields table itself; it also serves plain farm_id lookups
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_fields_farm_covering
+                ON fields(farm_id, field_name, area_hectares, historical_yield, center_lat, center_lon);
+            """)
+            # Ordered by priority and carrying every column WATER_PRIORITY_SQL reads
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_zones_farm_prio_covering
+                ON management_zones(farm_id, water_priority, zone_name, soil_health_score, historical_yield, ndvi_trend);
+            """)
+
             self.connection.commit()
+            # Gather planner statistics for the new indexes
+            self.connection.execute("PRAGMA analysis_limit=400")
+            self.connection.execute("PRAGMA optimize")
             print("Database schema created successfully!")
             
         except Exception as e:
@@ -99,60 +155,61 @@ class AgricultureDatabase:
     def create_sample_data(self):
         """Insert sample farm data for testing and demonstration"""
         try:
-            cursor = self.connection.cursor()
+            # Insert everything in a single transaction
+            with self.connection:
+                cursor = self.connection.cursor()
+                
+                # Insert sample farm
+                cursor.execute("""
+                    INSERT INTO farms (name, total_area_hectares)
+                    VALUES (?, ?)
+                """, ('Drought-Prone Valley Farm', 200.0))
+                
+                farm_id = cursor.lastrowid
+                
+                # Insert sample fields
+                fields = [
+                    (farm_id, 'North_Hills', 45, 36.85, -121.45, 'sandy_loam', 3.4),
+                    (farm_id, 'South_Valley', 68, 36.82, -121.35, 'clay', 2.7),
+                    (farm_id, 'East_Plateau', 52, 36.88, -121.32, 'sandy_loam', 3.6),
+                    (farm_id, 'West_Plains', 78, 36.83, -121.42, 'clay_loam', 2.8),
+                    (farm_id, 'Central_Basin', 35, 36.86, -121.38, 'loam', 3.2)
+                ]
+                
+                cursor.executemany("""
+                    INSERT INTO fields (farm_id, field_name, area_hectares, center_lat, center_lon, soil_type, historical_yield)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, fields)
+                
+                # Insert sample management zones
+                zones = [
+                    (farm_id, 'High_Productivity_Zone', 0.85, 3.8, 1, 0.75),
+                    (farm_id, 'Medium_Productivity_Zone', 0.65, 3.2, 2, 0.60),
+                    (farm_id, 'Low_Productivity_Zone', 0.45, 2.6, 3, 0.45)
+                ]
+                
+                cursor.executemany("""
+                    INSERT INTO management_zones (farm_id, zone_name, soil_health_score, historical_yield, water_priority, ndvi_trend)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, zones)
+                
+                # Insert recent satellite data
+                from datetime import date, timedelta
+                recent_date = date.today() - timedelta(days=7)
+                
+                satellite_data = [
+                    (1, recent_date, 0.68, 0.10, 'Landsat_8'),
+                    (2, recent_date, 0.42, 0.15, 'Landsat_8'),
+                    (3, recent_date, 0.72, 0.05, 'Landsat_8'),
+                    (4, recent_date, 0.51, 0.20, 'Landsat_8'),
+                    (5, recent_date, 0.61, 0.12, 'Landsat_8')
+                ]
+                
+                cursor.executemany("""
+                    INSERT INTO satellite_data (field_id, capture_date, ndvi_value, cloud_cover, data_source)
+                    VALUES (?, ?, ?, ?, ?)
+                """, satellite_data)
             
-            # Insert sample farm
-            cursor.execute("""
-                INSERT INTO farms (name, total_area_hectares)
-                VALUES (?, ?)
-            """, ('Drought-Prone Valley Farm', 200.0))
-            
-            farm_id = cursor.lastrowid
-            
-            # Insert sample fields
-            fields = [
-                (farm_id, 'North_Hills', 45, 36.85, -121.45, 'sandy_loam', 3.4),
-                (farm_id, 'South_Valley', 68, 36.82, -121.35, 'clay', 2.7),
-                (farm_id, 'East_Plateau', 52, 36.88, -121.32, 'sandy_loam', 3.6),
-                (farm_id, 'West_Plains', 78, 36.83, -121.42, 'clay_loam', 2.8),
-                (farm_id, 'Central_Basin', 35, 36.86, -121.38, 'loam', 3.2)
-            ]
-            
-            cursor.executemany("""
-                INSERT INTO fields (farm_id, field_name, area_hectares, center_lat, center_lon, soil_type, historical_yield)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, fields)
-            
-            # Insert sample management zones
-            zones = [
-                (farm_id, 'High_Productivity_Zone', 0.85, 3.8, 1, 0.75),
-                (farm_id, 'Medium_Productivity_Zone', 0.65, 3.2, 2, 0.60),
-                (farm_id, 'Low_Productivity_Zone', 0.45, 2.6, 3, 0.45)
-            ]
-            
-            cursor.executemany("""
-                INSERT INTO management_zones (farm_id, zone_name, soil_health_score, historical_yield, water_priority, ndvi_trend)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, zones)
-            
-            # Insert recent satellite data
-            from datetime import date, timedelta
-            recent_date = date.today() - timedelta(days=7)
-            
-            satellite_data = [
-                (1, recent_date, 0.68, 0.10, 'Landsat_8'),
-                (2, recent_date, 0.42, 0.15, 'Landsat_8'),
-                (3, recent_date, 0.72, 0.05, 'Landsat_8'),
-                (4, recent_date, 0.51, 0.20, 'Landsat_8'),
-                (5, recent_date, 0.61, 0.12, 'Landsat_8')
-            ]
-            
-            cursor.executemany("""
-                INSERT INTO satellite_data (field_id, capture_date, ndvi_value, cloud_cover, data_source)
-                VALUES (?, ?, ?, ?, ?)
-            """, satellite_data)
-            
-            self.connection.commit()
             print(f"Sample data created for farm ID: {farm_id}")
             print("Created: 1 farm, 5 fields, 3 management zones, 5 satellite readings")
             return farm_id
@@ -166,12 +223,7 @@ class AgricultureDatabase:
         try:
             cursor = self.connection.cursor()
             
-            cursor.execute("""
-                SELECT zone_name, soil_health_score, historical_yield, water_priority, ndvi_trend
-                FROM management_zones 
-                WHERE farm_id = ? 
-                ORDER BY water_priority ASC;
-            """, (farm_id,))
+            cursor.execute(WATER_PRIORITY_SQL, (farm_id,))
             
             zones = cursor.fetchall()
             return zones
@@ -185,14 +237,7 @@ class AgricultureDatabase:
         try:
             cursor = self.connection.cursor()
             
-            cursor.execute("""
-                SELECT f.field_name, f.area_hectares, f.historical_yield, 
-                       s.ndvi_value, s.capture_date
-                FROM fields f
-                LEFT JOIN satellite_data s ON f.id = s.field_id
-                WHERE f.farm_id = ?
-                ORDER BY s.capture_date DESC;
-            """, (farm_id,))
+            cursor.execute(FIELD_HEALTH_SQL, (farm_id,))
             
             fields = cursor.fetchall()
             return fields
@@ -200,6 +245,22 @@ class AgricultureDatabase:
         except Exception as e:
             print(f"Error fetching field health data: {e}")
             return []
+    
+    def get_water_priority_frame(self, farm_id):
+        """Load management zones straight into a DataFrame for analysis"""
+        try:
+            return pd.read_sql_query(WATER_PRIORITY_SQL, self.connection, params=(farm_id,))
+        except Exception as e:
+            print(f"Error fetching water priority data: {e}")
+            return pd.DataFrame()
+    
+    def get_field_health_frame(self, farm_id):
+        """Load field health data straight into a DataFrame for analysis"""
+        try:
+            return pd.read_sql_query(FIELD_HEALTH_SQL, self.connection, params=(farm_id,))
+        except Exception as e:
+            print(f"Error fetching field health data: {e}")
+            return pd.DataFrame()
 
 def main():
     """Test the database setup - Phase 1 Implementation"""
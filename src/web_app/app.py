@@ -1,35 +1,132 @@
 # -*- coding: utf-8 -*-
-from flask import Flask, render_template_string, jsonify, request
-import sys
+from flask import Flask, Response, request
+from flask.json.provider import JSONProvider
+import orjson
+import atexit
+import bisect
+import gzip
+import hashlib
 import os
 import sqlite3
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import repeat
 import math
-import random
+import numpy as np
+import queue
+import threading
+import time
+import zlib
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson's C encoder"""
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Health bands by NDVI lower bound (inclusive); reports are shared read-only dicts
+HEALTH_NDVI_THRESHOLDS = (0.3, 0.5, 0.7)
+HEALTH_REPORTS = (
+    {'status': 'critical', 'color': '#c0392b', 'recommendation': 'Immediate attention needed', 'action': 'Consult agronomist', 'risk_level': 'critical'},
+    {'status': 'stressed', 'color': '#e74c3c', 'recommendation': 'Check water and nutrients', 'action': 'Increase irrigation review', 'risk_level': 'high'},
+    {'status': 'moderate', 'color': '#f39c12', 'recommendation': 'Monitor growth patterns', 'action': 'Consider soil testing', 'risk_level': 'medium'},
+    {'status': 'healthy', 'color': '#27ae60', 'recommendation': 'Optimal vegetation health', 'action': 'Continue current practices', 'risk_level': 'low'}
+)
+
+def health_band_indices(ndvi):
+    """Index into HEALTH_REPORTS for each NDVI value (same banding as get_vegetation_health_report)"""
+    return np.searchsorted(HEALTH_NDVI_THRESHOLDS, ndvi, side='right')
+
+def health_distribution(ndvi):
+    counts = np.bincount(health_band_indices(ndvi), minlength=len(HEALTH_REPORTS)).tolist()
+    # Healthiest band first, matching the dashboard's legend order
+    return {HEALTH_REPORTS[band]['status']: counts[band] for band in reversed(range(len(HEALTH_REPORTS)))}
+
+@dataclass(slots=True)
+class TrendPoint:
+    date: str
+    ndvi: float
+    quality: float
+
+@dataclass(slots=True)
+class Coordinates:
+    lat: float
+    lon: float
+
+@dataclass(slots=True)
+class FieldRow:
+    id: int
+    name: str
+    area_hectares: float
+    historical_yield: float
+    ndvi_value: float
+    ndvi_timestamp: str
+    ndvi_source: str
+    ndvi_quality: float
+    priority_score: float
+    allocated_water: int
+    status: str
+    health_color: str
+    recommendation: str
+    action: str
+    risk_level: str
+    coordinates: Coordinates
+    allocation_sufficiency: float
+
+@dataclass(slots=True)
+class FieldRowWithTrend(FieldRow):
+    historical_trend: list
+
+@lru_cache(maxsize=2)
+def seasonal_ndvi_base(day_of_year):
+    return 0.3 + (math.sin((day_of_year - 100) / 365 * 2 * math.pi) * 0.4)
+
+@lru_cache(maxsize=2)
+def trend_ndvi_base(day_of_year):
+    return 0.5 + (math.sin(day_of_year / 365 * 2 * math.pi) * 0.3)
+
+# Per-field NDVI offset; crc32 keeps it identical across worker processes,
+# unlike str hash() which is salted per interpreter
+@lru_cache(maxsize=1024)
+def field_ndvi_factor(field_name):
+    return zlib.crc32(field_name.encode('utf-8')) % 30 / 100 if field_name else 0.1
 
 class SatelliteDataService:
     def __init__(self):
         self.nasa_username = os.environ.get('NASA_EARTHDATA_USERNAME', 'demo_user')
         self.nasa_password = os.environ.get('NASA_EARTHDATA_PASSWORD', 'demo_pass')
+        self.rng = np.random.default_rng()
+        # Under gunicorn --preload every worker forks from one process; give each its own stream
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reseed)
+    
+    def reseed(self):
+        self.rng = np.random.default_rng()
     
     def get_nasa_ndvi_data(self, lat, lon, field_name=None):
         try:
-            day_of_year = datetime.now().timetuple().tm_yday
-            seasonal_base = 0.3 + (math.sin((day_of_year - 100) / 365 * 2 * math.pi) * 0.4)
+            now = datetime.now()
+            seasonal_base = seasonal_ndvi_base(now.timetuple().tm_yday)
             location_factor = ((lat * 100 + lon * 100) % 50) / 100
-            field_factor = hash(field_name or "default") % 30 / 100 if field_name else 0.1
-            weather_effect = random.uniform(-0.1, 0.1)
+            field_factor = field_ndvi_factor(field_name)
+            weather_effect = self.rng.uniform(-0.1, 0.1)
             
             simulated_ndvi = seasonal_base + location_factor + field_factor + weather_effect
             simulated_ndvi = max(0.1, min(0.95, round(simulated_ndvi, 3)))
-            quality_score = random.uniform(0.85, 0.98)
+            quality_score = self.rng.uniform(0.85, 0.98)
             
             return {
                 'ndvi': simulated_ndvi,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'source': 'NASA_HLS_SIMULATED',
                 'coordinates': {'lat': lat, 'lon': lon},
                 'quality_score': round(quality_score, 2),
@@ -39,19 +136,41 @@ class SatelliteDataService:
             print(f"Satellite data error: {e}")
             return self.get_fallback_ndvi_data(lat, lon)
     
-    def get_historical_ndvi_trend(self, lat, lon, days=30):
-        trends = []
-        base_ndvi = 0.5 + (math.sin(datetime.now().timetuple().tm_yday / 365 * 2 * math.pi) * 0.3)
-        for i in range(days, 0, -7):
-            date = datetime.now() - timedelta(days=i)
-            fluctuation = random.uniform(-0.15, 0.15)
-            trend_ndvi = max(0.2, min(0.9, base_ndvi + fluctuation))
-            trends.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'ndvi': round(trend_ndvi, 3),
-                'quality': random.uniform(0.8, 0.95)
-            })
-        return trends
+    def get_nasa_ndvi_batch(self, lats, lons, names, now):
+        """Vectorized get_nasa_ndvi_data: returns (ndvi, quality_score) arrays for many fields as of `now`"""
+        seasonal_base = seasonal_ndvi_base(now.timetuple().tm_yday)
+        
+        simulated_ndvi = self.rng.uniform(-0.1, 0.1, len(names))  # weather effect
+        simulated_ndvi += seasonal_base
+        simulated_ndvi += ((lats * 100 + lons * 100) % 50) / 100
+        simulated_ndvi += np.fromiter((field_ndvi_factor(name) for name in names), dtype=np.float64, count=len(names))
+        np.round(simulated_ndvi, 3, out=simulated_ndvi)
+        np.clip(simulated_ndvi, 0.1, 0.95, out=simulated_ndvi)
+        
+        quality_score = self.rng.uniform(0.85, 0.98, len(names))
+        np.round(quality_score, 2, out=quality_score)
+        return simulated_ndvi, quality_score
+    
+    def get_historical_ndvi_trend(self, lat, lon, days=30, now=None):
+        return self.get_historical_ndvi_trends(1, days, now)[0]
+    
+    def get_historical_ndvi_trends(self, count, days=30, now=None):
+        """Weekly NDVI history for `count` fields, drawing every field's noise in one call"""
+        if now is None:
+            now = datetime.now()
+        base_ndvi = trend_ndvi_base(now.timetuple().tm_yday)
+        offsets = range(days, 0, -7)
+        dates = [(now - timedelta(days=i)).strftime('%Y-%m-%d') for i in offsets]
+        trend_ndvi = self.rng.uniform(-0.15, 0.15, (count, len(offsets)))
+        trend_ndvi += base_ndvi
+        np.clip(trend_ndvi, 0.2, 0.9, out=trend_ndvi)
+        np.round(trend_ndvi, 3, out=trend_ndvi)
+        trend_ndvi = trend_ndvi.tolist()
+        quality = self.rng.uniform(0.8, 0.95, (count, len(offsets))).tolist()
+        return [
+            [TrendPoint(date, ndvi, q) for date, ndvi, q in zip(dates, field_ndvi, field_quality)]
+            for field_ndvi, field_quality in zip(trend_ndvi, quality)
+        ]
     
     def get_fallback_ndvi_data(self, lat, lon):
         return {
@@ -64,19 +183,58 @@ class SatelliteDataService:
         }
     
     def get_vegetation_health_report(self, ndvi_value):
-        if ndvi_value >= 0.7:
-            return {'status': 'healthy', 'color': '#27ae60', 'recommendation': 'Optimal vegetation health', 'action': 'Continue current practices', 'risk_level': 'low'}
-        elif ndvi_value >= 0.5:
-            return {'status': 'moderate', 'color': '#f39c12', 'recommendation': 'Monitor growth patterns', 'action': 'Consider soil testing', 'risk_level': 'medium'}
-        elif ndvi_value >= 0.3:
-            return {'status': 'stressed', 'color': '#e74c3c', 'recommendation': 'Check water and nutrients', 'action': 'Increase irrigation review', 'risk_level': 'high'}
-        else:
-            return {'status': 'critical', 'color': '#c0392b', 'recommendation': 'Immediate attention needed', 'action': 'Consult agronomist', 'risk_level': 'critical'}
+        return HEALTH_REPORTS[bisect.bisect_right(HEALTH_NDVI_THRESHOLDS, ndvi_value)]
+
+MOCK_FIELD_COORDINATES = [
+    (40.7128, -74.0060, "North Valley"), (40.7135, -74.0055, "South Slope"),
+    (40.7120, -74.0070, "East Ridge"), (34.0522, -118.2437, "West Plains"),
+    (34.0530, -118.2440, "Central Basin"), (41.8781, -87.6298, "River Bottom"),
+    (41.8790, -87.6285, "Hilltop View"), (32.7767, -96.7970, "Meadow Field"),
+    (32.7775, -96.7960, "Heritage Acres")
+]
+MOCK_LATS = np.array([coord[0] for coord in MOCK_FIELD_COORDINATES])
+MOCK_LONS = np.array([coord[1] for coord in MOCK_FIELD_COORDINATES])
+MOCK_NAMES = [coord[2] for coord in MOCK_FIELD_COORDINATES]
+_mock_index = np.arange(len(MOCK_FIELD_COORDINATES))
+MOCK_AREA = (45 + _mock_index * 8).tolist()
+MOCK_YIELD = (6.0 + _mock_index * 0.4).tolist()
+MOCK_PRIORITY = np.round(0.3 + _mock_index * 0.08, 3)
+MOCK_ALLOCATED = 80000 + _mock_index * 12000
+MOCK_SUFFICIENCY = 0.65 + _mock_index * 0.04
+MOCK_SUMMARY = {
+    'total_water_allocated': int(MOCK_ALLOCATED.sum()),
+    'high_priority_zones': int(np.count_nonzero(MOCK_PRIORITY > 0.7)),
+    'water_stress_count': int(np.count_nonzero(MOCK_SUFFICIENCY < 0.6))
+}
+MOCK_COVERAGE_KM2 = round(sum(MOCK_AREA) * 0.01, 2)
+
+DB_POOL_SIZE = 8
+
+# Farm and field rows in one round trip; rows are read positionally in this column order
+DASHBOARD_SQL = """
+    SELECT farms.name, farms.total_area_hectares,
+           fields.field_name, fields.area_hectares, fields.historical_yield,
+           fields.center_lat, fields.center_lon
+    FROM farms
+    LEFT JOIN fields ON fields.farm_id = farms.id
+    WHERE farms.id = ?
+    ORDER BY fields.id
+"""
 
 class EnhancedAgricultureDashboard:
     def __init__(self):
         self.db_path = self.get_database_path()
         self.satellite_service = SatelliteDataService()
+        self.reset_pool()
+        # SQLite handles must not cross a fork, so preloaded workers start with an empty pool
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reset_pool)
+        atexit.register(self.optimize_pool)
+    
+    def reset_pool(self):
+        self._pool = queue.Queue()
+        self._pool_created = 0
+        self._pool_lock = threading.Lock()
     
     def get_database_path(self):
         if 'RAILWAY_VOLUME_MOUNT_PATH' in os.environ:
@@ -87,35 +245,88 @@ class EnhancedAgricultureDashboard:
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         return db_path
     
-    def get_dashboard_data(self, farm_id=1):
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, cached_statements=64, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-20000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA analysis_limit=400')
+        conn.execute('PRAGMA optimize')
+        return conn
+    
+    def optimize_pool(self):
+        """Run PRAGMA optimize on idle pooled connections and close them, so the next process starts with fresh stats"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.execute('PRAGMA optimize')
+            except sqlite3.Error as e:
+                print(f"PRAGMA optimize failed: {e}")
+            finally:
+                conn.close()
+                with self._pool_lock:
+                    self._pool_created -= 1
+    
+    @contextmanager
+    def pooled_connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._pool_created < DB_POOL_SIZE
+                if create:
+                    self._pool_created += 1
+            if create:
+                try:
+                    conn = self.get_connection()
+                except Exception:
+                    with self._pool_lock:
+                        self._pool_created -= 1
+                    raise
+            else:
+                conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+    
+    def get_dashboard_data(self, farm_id=1, include_trend=False):
         try:
             if not os.path.exists(self.db_path):
-                return self.get_enhanced_mock_data()
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT name, total_area_hectares, center_lat, center_lon FROM farms WHERE id = ?", (farm_id,))
-            farm = cursor.fetchone()
-            cursor.execute("SELECT field_name, area_hectares, historical_yield, center_lat, center_lon FROM fields WHERE farm_id = ?", (farm_id,))
-            fields = cursor.fetchall()
-            conn.close()
-            return self.process_enhanced_data(farm, fields)
+                return self.get_enhanced_mock_data(include_trend)
+            # Farm columns repeat on every row; a farm without fields yields one row of NULL field columns
+            farm = None
+            fields = []
+            with self.pooled_connection() as conn:
+                for row in conn.execute(DASHBOARD_SQL, (farm_id,)):
+                    if farm is None:
+                        farm = row[:2]
+                    if row[2] is not None:
+                        fields.append(row[2:])
+            return self.process_enhanced_data(farm, fields, include_trend)
         except Exception as e:
             print(f"Enhanced dashboard error: {e}")
-            return self.get_enhanced_mock_data()
+            return self.get_enhanced_mock_data(include_trend)
     
-    def process_enhanced_data(self, farm, fields):
+    def process_enhanced_data(self, farm, fields, include_trend=False):
+        """farm is a (name, total_area_hectares) tuple; fields are (field_name, area_hectares, historical_yield, center_lat, center_lon) tuples"""
+        now = datetime.now()
         dashboard_data = {
-            'farm_name': farm['name'] if farm else 'Satellite-Monitored Farm',
-            'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'farm_name': farm[0] if farm else 'Satellite-Monitored Farm',
+            'analysis_date': now.strftime('%Y-%m-%d %H:%M'),
             'fields': [],
             'summary': {
                 'total_fields': len(fields),
-                'total_area': sum(field['area_hectares'] for field in fields),
+                'total_area': sum(field[1] for field in fields),
                 'high_priority_zones': 0,
                 'water_stress_count': 0,
                 'satellite_coverage': 'Active',
-                'last_satellite_update': datetime.now().strftime('%Y-%m-%d %H:%M UTC')
+                'last_satellite_update': now.strftime('%Y-%m-%d %H:%M UTC')
             },
             'satellite_metrics': {
                 'average_ndvi': 0,
@@ -126,225 +337,222 @@ class EnhancedAgricultureDashboard:
             }
         }
         
-        ndvi_values = []
-        health_counts = {'healthy': 0, 'moderate': 0, 'stressed': 0, 'critical': 0}
-        total_area = 0
+        names, field_area, field_yield, field_lats, field_lons = map(list, zip(*fields)) if fields else ([], [], [], [], [])
+        lats = np.array([lat or (40.0 + (i * 0.1)) for i, lat in enumerate(field_lats)], dtype=np.float64)
+        lons = np.array([lon or (-100.0 + (i * 0.1)) for i, lon in enumerate(field_lons)], dtype=np.float64)
+        area = np.array(field_area, dtype=np.float64)
+        historical_yield = np.array(field_yield, dtype=np.float64)
         
-        for i, field in enumerate(fields):
-            lat = field['center_lat'] or (40.0 + (i * 0.1))
-            lon = field['center_lon'] or (-100.0 + (i * 0.1))
-            satellite_data = self.satellite_service.get_nasa_ndvi_data(lat, lon, field['field_name'])
-            health_report = self.satellite_service.get_vegetation_health_report(satellite_data['ndvi'])
-            health_counts[health_report['status']] += 1
-            ndvi_values.append(satellite_data['ndvi'])
-            total_area += field['area_hectares']
-            
-            field_data = {
-                'id': i + 1,
-                'name': field['field_name'],
-                'area_hectares': field['area_hectares'],
-                'historical_yield': field['historical_yield'],
-                'ndvi_value': satellite_data['ndvi'],
-                'ndvi_timestamp': satellite_data['timestamp'],
-                'ndvi_source': satellite_data['source'],
-                'ndvi_quality': satellite_data['quality_score'],
-                'priority_score': self.calculate_priority_score(field, satellite_data['ndvi']),
-                'allocated_water': int(field['area_hectares'] * 8 * (1.5 - satellite_data['ndvi'])),
-                'status': health_report['status'],
-                'health_color': health_report['color'],
-                'recommendation': health_report['recommendation'],
-                'action': health_report['action'],
-                'risk_level': health_report['risk_level'],
-                'coordinates': {'lat': lat, 'lon': lon},
-                'historical_trend': self.satellite_service.get_historical_ndvi_trend(lat, lon)
-            }
-            field_data['allocation_sufficiency'] = field_data['allocated_water'] / (field['area_hectares'] * 12)
-            dashboard_data['fields'].append(field_data)
+        ndvi, quality = self.satellite_service.get_nasa_ndvi_batch(lats, lons, names, now)
+        priority = self.calculate_priority_scores(historical_yield, area, ndvi)
+        allocated = (area * 8 * (1.5 - ndvi)).astype(np.int64)
+        sufficiency = allocated / (area * 12)
+        
+        dashboard_data['fields'] = self.build_field_records(
+            names, lats, lons, field_area, field_yield,
+            ndvi, quality, now, priority, allocated, sufficiency, include_trend
+        )
         
-        if dashboard_data['fields']:
-            dashboard_data['summary']['total_water_allocated'] = sum(f['allocated_water'] for f in dashboard_data['fields'])
-            dashboard_data['summary']['high_priority_zones'] = len([f for f in dashboard_data['fields'] if f['priority_score'] > 0.7])
-            dashboard_data['summary']['water_stress_count'] = len([f for f in dashboard_data['fields'] if f['allocation_sufficiency'] < 0.6])
-            dashboard_data['satellite_metrics']['average_ndvi'] = round(sum(ndvi_values) / len(ndvi_values), 3)
-            dashboard_data['satellite_metrics']['health_distribution'] = health_counts
-            dashboard_data['satellite_metrics']['total_coverage_km2'] = round(total_area * 0.01, 2)
-            dashboard_data['satellite_metrics']['data_quality'] = 'High' if all(f['ndvi_quality'] > 0.85 for f in dashboard_data['fields']) else 'Medium'
+        if fields:
+            summary = dashboard_data['summary']
+            metrics = dashboard_data['satellite_metrics']
+            summary['total_water_allocated'] = int(allocated.sum())
+            summary['high_priority_zones'] = int(np.count_nonzero(priority > 0.7))
+            summary['water_stress_count'] = int(np.count_nonzero(sufficiency < 0.6))
+            metrics['average_ndvi'] = round(float(ndvi.mean()), 3)
+            metrics['health_distribution'] = health_distribution(ndvi)
+            metrics['total_coverage_km2'] = round(float(area.sum()) * 0.01, 2)
+            metrics['data_quality'] = 'High' if (quality > 0.85).all() else 'Medium'
         
         return dashboard_data
     
-    def calculate_priority_score(self, field, ndvi_value):
-        yield_factor = min(1.0, field['historical_yield'] / 8.0)
-        area_factor = min(1.0, field['area_hectares'] / 200.0)
-        health_factor = ndvi_value
-        priority_score = (yield_factor * 0.3 + area_factor * 0.2 + health_factor * 0.5)
-        return round(priority_score, 3)
+    def calculate_priority_scores(self, historical_yield, area, ndvi):
+        yield_factor = np.minimum(1.0, historical_yield / 8.0)
+        area_factor = np.minimum(1.0, area / 200.0)
+        return np.round(yield_factor * 0.3 + area_factor * 0.2 + ndvi * 0.5, 3)
     
-    def get_enhanced_mock_data(self):
-        field_coordinates = [
-            (40.7128, -74.0060, "North Valley"), (40.7135, -74.0055, "South Slope"),
-            (40.7120, -74.0070, "East Ridge"), (34.0522, -118.2437, "West Plains"),
-            (34.0530, -118.2440, "Central Basin"), (41.8781, -87.6298, "River Bottom"),
-            (41.8790, -87.6285, "Hilltop View"), (32.7767, -96.7970, "Meadow Field"),
-            (32.7775, -96.7960, "Heritage Acres")
+    def build_field_records(self, names, lats, lons, area, historical_yield, ndvi, quality, now, priority, allocated, sufficiency, include_trend=False):
+        timestamp = now.isoformat()
+        reports = [HEALTH_REPORTS[band] for band in health_band_indices(ndvi).tolist()]
+        if include_trend:
+            row_type = FieldRowWithTrend
+            extras = ({'historical_trend': trend} for trend in self.satellite_service.get_historical_ndvi_trends(len(names), now=now))
+        else:
+            row_type = FieldRow
+            extras = repeat({})
+        return [
+            row_type(
+                id=i + 1,
+                name=name,
+                area_hectares=field_area,
+                historical_yield=field_yield,
+                ndvi_value=field_ndvi,
+                ndvi_timestamp=timestamp,
+                ndvi_source='NASA_HLS_SIMULATED',
+                ndvi_quality=field_quality,
+                priority_score=field_priority,
+                allocated_water=field_water,
+                status=report['status'],
+                health_color=report['color'],
+                recommendation=report['recommendation'],
+                action=report['action'],
+                risk_level=report['risk_level'],
+                coordinates=Coordinates(lat, lon),
+                allocation_sufficiency=field_sufficiency,
+                **extra
+            )
+            for i, (name, lat, lon, field_area, field_yield, field_ndvi, field_quality, field_priority, field_water, field_sufficiency, report, extra)
+            in enumerate(zip(names, lats.tolist(), lons.tolist(), area, historical_yield, ndvi.tolist(), quality.tolist(),
+                             priority.tolist(), allocated.tolist(), sufficiency.tolist(), reports, extras))
         ]
+    
+    def get_enhanced_mock_data(self, include_trend=False):
+        now = datetime.now()
+        ndvi, quality = self.satellite_service.get_nasa_ndvi_batch(MOCK_LATS, MOCK_LONS, MOCK_NAMES, now)
+        fields = self.build_field_records(
+            MOCK_NAMES, MOCK_LATS, MOCK_LONS, MOCK_AREA, MOCK_YIELD,
+            ndvi, quality, now, MOCK_PRIORITY, MOCK_ALLOCATED, MOCK_SUFFICIENCY, include_trend
+        )
         
-        fields = []
-        ndvi_values = []
-        health_counts = {'healthy': 0, 'moderate': 0, 'stressed': 0, 'critical': 0}
-        total_area = 0
-        
-        for i, (lat, lon, name) in enumerate(field_coordinates):
-            satellite_data = self.satellite_service.get_nasa_ndvi_data(lat, lon, name)
-            health_report = self.satellite_service.get_vegetation_health_report(satellite_data['ndvi'])
-            health_counts[health_report['status']] += 1
-            ndvi_values.append(satellite_data['ndvi'])
-            area = 45 + (i * 8)
-            total_area += area
-            
-            field_data = {
-                'id': i + 1, 'name': name, 'area_hectares': area, 'historical_yield': 6.0 + (i * 0.4),
-                'ndvi_value': satellite_data['ndvi'], 'ndvi_timestamp': satellite_data['timestamp'],
-                'ndvi_source': satellite_data['source'], 'ndvi_quality': satellite_data['quality_score'],
-                'priority_score': round(0.3 + (i * 0.08), 3), 'allocated_water': 80000 + (i * 12000),
-                'status': health_report['status'], 'health_color': health_report['color'],
-                'recommendation': health_report['recommendation'], 'action': health_report['action'],
-                'risk_level': health_report['risk_level'], 'coordinates': {'lat': lat, 'lon': lon},
-                'historical_trend': self.satellite_service.get_historical_ndvi_trend(lat, lon)
-            }
-            field_data['allocation_sufficiency'] = 0.65 + (i * 0.04)
-            fields.append(field_data)
-        
-        avg_ndvi = round(sum(ndvi_values) / len(ndvi_values), 3)
         return {
             'farm_name': 'Satellite-Enhanced Precision Farm',
-            'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'analysis_date': now.strftime('%Y-%m-%d %H:%M'),
             'fields': fields,
             'summary': {
                 'total_fields': len(fields),
-                'total_water_allocated': sum(f['allocated_water'] for f in fields),
-                'high_priority_zones': len([f for f in fields if f['priority_score'] > 0.7]),
-                'water_stress_count': len([f for f in fields if f['allocation_sufficiency'] < 0.6]),
+                **MOCK_SUMMARY,
                 'satellite_coverage': 'Active',
-                'last_satellite_update': datetime.now().strftime('%Y-%m-%d %H:%M UTC')
+                'last_satellite_update': now.strftime('%Y-%m-%d %H:%M UTC')
             },
             'satellite_metrics': {
-                'average_ndvi': avg_ndvi,
-                'health_distribution': health_counts,
+                'average_ndvi': round(float(ndvi.mean()), 3),
+                'health_distribution': health_distribution(ndvi),
                 'data_quality': 'High',
-                'total_coverage_km2': round(total_area * 0.01, 2),
+                'total_coverage_km2': MOCK_COVERAGE_KM2,
                 'images_processed': len(fields) * 4
             }
         }
 
 dashboard = EnhancedAgricultureDashboard()
 
+with open(os.path.join(app.static_folder, 'index.html'), 'rb') as f:
+    _INDEX_HTML = f.read()
+_INDEX_HTML_GZ = gzip.compress(_INDEX_HTML, 9)
+_INDEX_ETAG = hashlib.blake2b(_INDEX_HTML, digest_size=16).hexdigest()
+INDEX_MAX_AGE = 300
+
+COMPRESS_MIN_SIZE = 500
+COMPRESS_MIMETYPES = {'text/html', 'application/json'}
+
+def accepts_gzip():
+    return request.accept_encodings['gzip'] > 0
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or not accepts_gzip()):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, 6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def index():
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Precision Agriculture Dashboard</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 40px; background: #f0f7f4; }
-            .container { max-width: 1200px; margin: 0 auto; }
-            .header { background: #2c3e50; color: white; padding: 20px; border-radius: 5px; margin-bottom: 20px; }
-            .summary-cards { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin-bottom: 20px; }
-            .card { background: white; padding: 20px; border-radius: 5px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); transition: transform 0.3s; }
-            .card:hover { transform: translateY(-5px); box-shadow: 0 5px 15px rgba(0,0,0,0.2); }
-            .field-list { background: white; padding: 20px; border-radius: 5px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
-            .field-item { border-bottom: 1px solid #eee; padding: 15px 0; transition: background 0.3s; }
-            .field-item:hover { background: #f9f9f9; }
-            .loading { color: #666; font-style: italic; }
-            .health-bar { height: 10px; background: #ecf0f1; border-radius: 5px; margin: 5px 0; overflow: hidden; }
-            .health-fill { height: 100%; border-radius: 5px; transition: width 0.5s ease; }
-            .health-healthy { background: #27ae60; }
-            .health-moderate { background: #f39c12; }
-            .health-stressed { background: #e74c3c; }
-            .health-critical { background: #c0392b; }
-            .status-healthy { color: #27ae60; font-weight: bold; }
-            .status-moderate { color: #f39c12; font-weight: bold; }
-            .status-stressed { color: #e74c3c; font-weight: bold; }
-            .status-critical { color: #c0392b; font-weight: bold; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Precision Agriculture Dashboard</h1>
-                <p>Satellite Monitoring System</p>
-            </div>
-            
-            <div class="summary-cards" id="summaryCards">
-                <div class="card"><h3>Total Fields</h3><p id="totalFields" class="loading">Loading...</p></div>
-                <div class="card"><h3>Water Allocated</h3><p id="waterAllocated" class="loading">Loading...</p></div>
-                <div class="card"><h3>Average NDVI</h3><p id="averageNdvi" class="loading">Loading...</p></div>
-                <div class="card"><h3>High Priority</h3><p id="highPriority" class="loading">Loading...</p></div>
-            </div>
-
-            <div class="field-list">
-                <h2>Field Analysis</h2>
-                <div id="fieldList" class="loading">Loading field data...</div>
-            </div>
-        </div>
-
-        <script>
-            async function loadDashboardData() {
-                try {
-                    const response = await fetch('/api/dashboard-data');
-                    const data = await response.json();
-                    
-                    document.getElementById('totalFields').textContent = data.summary.total_fields;
-                    document.getElementById('totalFields').className = '';
-                    
-                    document.getElementById('waterAllocated').textContent = data.summary.total_water_allocated.toLocaleString() + ' m3';
-                    document.getElementById('waterAllocated').className = '';
-                    
-                    document.getElementById('averageNdvi').textContent = data.satellite_metrics.average_ndvi;
-                    document.getElementById('averageNdvi').className = '';
-                    
-                    document.getElementById('highPriority').textContent = data.summary.high_priority_zones;
-                    document.getElementById('highPriority').className = '';
-
-                    const fieldList = document.getElementById('fieldList');
-                    fieldList.innerHTML = '';
-                    fieldList.className = '';
-                    
-                    data.fields.forEach(field => {
-                        const fieldItem = document.createElement('div');
-                        fieldItem.className = 'field-item';
-                        
-                        const healthPercentage = field.ndvi_value * 100;
-                        const healthClass = 'health-' + field.status;
-                        const statusClass = 'status-' + field.status;
-                        
-                        fieldItem.innerHTML = `
-                            <h3>${field.name} (${field.area_hectares} ha)</h3>
-                            <div class="health-bar">
-                                <div class="health-fill ${healthClass}" style="width: ${healthPercentage}%"></div>
-                            </div>
-                            <p>NDVI: ${field.ndvi_value} | Health: <span class="${statusClass}">${field.status.toUpperCase()}</span> | Priority: ${field.priority_score}</p>
-                            <p>Water: ${field.allocated_water} m3 | Recommendation: ${field.recommendation}</p>
-                        `;
-                        fieldList.appendChild(fieldItem);
-                    });
-
-                } catch (error) {
-                    console.error('Error loading dashboard data:', error);
-                    document.getElementById('fieldList').innerHTML = '<p>Error loading data</p>';
-                }
-            }
-            document.addEventListener('DOMContentLoaded', loadDashboardData);
-        </script>
-    </body>
-    </html>"""
-    return render_template_string(html_content)
+    if accepts_gzip():
+        response = Response(_INDEX_HTML_GZ, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(_INDEX_ETAG + '-gz')
+    else:
+        response = Response(_INDEX_HTML, mimetype='text/html')
+        response.set_etag(_INDEX_ETAG)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = INDEX_MAX_AGE
+    return response.make_conditional(request)
+
+DASHBOARD_CACHE_TTL = 30
+DASHBOARD_CACHE_SIZE = 32
+_dashboard_cache = {}
+_dashboard_cache_lock = threading.Lock()
+# One build lock per key: when an entry expires, a single thread rebuilds it and
+# concurrent requests for the same key wait for that result instead of querying too
+_dashboard_build_locks = {}
+
+def get_dashboard_payload(farm_id, include_trend=False):
+    key = (farm_id, include_trend)
+    with _dashboard_cache_lock:
+        entry = _dashboard_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            # Re-inserting moves the key to the end, so dict order runs least to most recently used
+            _dashboard_cache[key] = _dashboard_cache.pop(key)
+            return entry[1:]
+        build_lock = _dashboard_build_locks.setdefault(key, threading.Lock())
+    
+    with build_lock:
+        # Another thread may have rebuilt the entry while this one waited
+        with _dashboard_cache_lock:
+            entry = _dashboard_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1:]
+        
+        payload = orjson.dumps(dashboard.get_dashboard_data(farm_id, include_trend), option=OrjsonProvider.option)
+        payload_gz = gzip.compress(payload, 6)
+        etag = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        with _dashboard_cache_lock:
+            _dashboard_cache.pop(key, None)
+            if len(_dashboard_cache) >= DASHBOARD_CACHE_SIZE:
+                # Expired entries go first; only then the least recently used live one
+                now = time.monotonic()
+                evicted = [k for k, cached in _dashboard_cache.items() if cached[0] <= now] or [next(iter(_dashboard_cache))]
+                for k in evicted:
+                    _dashboard_cache.pop(k)
+                    _dashboard_build_locks.pop(k, None)
+            _dashboard_cache[key] = (time.monotonic() + DASHBOARD_CACHE_TTL, payload, payload_gz, etag)
+    return payload, payload_gz, etag
+
+def prime_dashboard_cache():
+    """Build payloads for every known farm up front so the first polls are cache hits"""
+    farm_ids = [1]
+    if os.path.exists(dashboard.db_path):
+        try:
+            with closing(sqlite3.connect(dashboard.db_path)) as conn:
+                farm_ids = [row[0] for row in conn.execute('SELECT id FROM farms ORDER BY id')] or farm_ids
+        except sqlite3.Error as e:
+            print(f"Dashboard cache priming skipped: {e}")
+            return
+    for farm_id in farm_ids[:DASHBOARD_CACHE_SIZE]:
+        get_dashboard_payload(farm_id)
+    # Priming runs in the gunicorn master under --preload; close its connections so none are inherited by workers
+    dashboard.optimize_pool()
+
+prime_dashboard_cache()
 
 @app.route('/api/dashboard-data')
 def get_dashboard_data():
     farm_id = request.args.get('farm_id', 1, type=int)
-    data = dashboard.get_dashboard_data(farm_id)
-    return jsonify(data)
+    include_trend = 'trend' in request.args.get('include', '').split(',')
+    payload, payload_gz, etag = get_dashboard_payload(farm_id, include_trend)
+    gzipped = accepts_gzip()
+    if gzipped:
+        etag += '-gz'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif gzipped:
+        response = Response(payload_gz, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload, mimetype='application/json')
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = DASHBOARD_CACHE_TTL
+    return response
 
 @app.route('/api/satellite/field/<int:field_id>')
 def get_field_satellite_data(field_id):
@@ -352,15 +560,17 @@ def get_field_satellite_data(field_id):
     lon = -100.0 + (field_id * 0.1)
     satellite_data = dashboard.satellite_service.get_nasa_ndvi_data(lat, lon, f"Field {field_id}")
     satellite_data['historical_trend'] = dashboard.satellite_service.get_historical_ndvi_trend(lat, lon)
-    return jsonify(satellite_data)
+    return Response(orjson.dumps(satellite_data, option=OrjsonProvider.option), mimetype='application/json')
+
+_HEALTH_PAYLOAD = orjson.dumps({
+    'status': 'healthy', 
+    'message': 'Precision Agriculture Dashboard',
+    'environment': 'production' if 'RAILWAY' in os.environ else 'development'
+})
 
 @app.route('/api/health')
 def health_check():
-    return jsonify({
-        'status': 'healthy', 
-        'message': 'Precision Agriculture Dashboard',
-        'environment': 'production' if 'RAILWAY' in os.environ else 'development'
-    })
+    return Response(_HEALTH_PAYLOAD, mimetype='application/json')
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))